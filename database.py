@@ -0,0 +1,271 @@
+import asyncio
+import sqlite3
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import aiosqlite
+
+# Путь к файлу базы данных
+DB_PATH = "storage.db"
+
+# Параметры пакетной записи журнала
+LOG_BATCH_SIZE = 200
+LOG_FLUSH_INTERVAL = 0.5
+
+# Соответствие типа позиции таблице в базе; ключи интернированы,
+# чтобы поиск по словарю шёл через сравнение указателей
+TABLES = {
+    sys.intern("Оборудование"): "equipment",
+    sys.intern("Компоненты"): "components",
+}
+
+# SQL-константы: один и тот же текст запроса на каждый вызов,
+# чтобы попадать во внутренний кэш подготовленных выражений sqlite3
+GET_BY_ID_SQL = {
+    t: f"SELECT * FROM {tbl} WHERE id = ?" for t, tbl in TABLES.items()
+}
+SEARCH_BY_NAME_SQL = {
+    t: (
+        f"SELECT {tbl}.* FROM {tbl} "
+        f"JOIN {tbl}_fts ON {tbl}.id = {tbl}_fts.rowid "
+        f"WHERE {tbl}_fts MATCH ? ORDER BY {tbl}_fts.rank LIMIT 50"
+    )
+    for t, tbl in TABLES.items()
+}
+UPDATE_QUANTITY_SQL = {
+    t: f"UPDATE {tbl} SET количество = количество + ? WHERE id = ? RETURNING *"
+    for t, tbl in TABLES.items()
+}
+INSERT_EQUIPMENT_SQL = (
+    "INSERT INTO equipment (название, тип, количество) VALUES (?, ?, ?)"
+)
+INSERT_COMPONENT_SQL = (
+    "INSERT INTO components (название, количество, размер, тип) VALUES (?, ?, ?, ?)"
+)
+INSERT_LOG_SQL = (
+    "INSERT INTO log (user_id, action, item_type, item_id, details, timestamp) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+
+
+class StorageDB:
+    """Обёртка над SQLite-базой склада (асинхронная, через aiosqlite)"""
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+        self.conn: Optional[aiosqlite.Connection] = None
+        self._log_q: asyncio.Queue = asyncio.Queue()
+
+    async def connect(self):
+        """Открытие соединения, настройка и создание таблиц"""
+        self.conn = await aiosqlite.connect(
+            self.db_path, cached_statements=256, isolation_level=None
+        )
+        self.conn.row_factory = sqlite3.Row
+        await self._tune_connection()
+        await self._create_tables()
+
+    async def close(self):
+        """Закрытие соединения с дозаписью журнала"""
+        if self.conn is not None:
+            await self._flush_pending_logs()
+            await self.conn.close()
+            self.conn = None
+
+    async def _tune_connection(self):
+        """Настройка соединения: WAL и работа через память вместо диска"""
+        # page_size действует только до создания первых таблиц
+        await self.conn.execute("PRAGMA page_size=4096")
+        await self.conn.execute("PRAGMA journal_mode=WAL")
+        await self.conn.execute("PRAGMA synchronous=NORMAL")
+        # 64 МБ страничного кэша
+        await self.conn.execute("PRAGMA cache_size=-65536")
+        await self.conn.execute("PRAGMA temp_store=MEMORY")
+        await self.conn.execute("PRAGMA mmap_size=268435456")
+
+    async def _create_tables(self):
+        """Создание таблиц и полнотекстовых индексов при первом запуске"""
+        async with self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'equipment_fts'"
+        ) as cur:
+            had_fts = await cur.fetchone() is not None
+
+        await self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS equipment (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                название TEXT NOT NULL,
+                тип TEXT NOT NULL,
+                количество INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS components (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                название TEXT NOT NULL,
+                количество INTEGER NOT NULL DEFAULT 0,
+                размер TEXT NOT NULL,
+                тип TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                action TEXT NOT NULL,
+                item_type TEXT NOT NULL,
+                item_id INTEGER NOT NULL,
+                details TEXT,
+                timestamp REAL NOT NULL DEFAULT (unixepoch('subsec'))
+            );
+
+            CREATE VIRTUAL TABLE IF NOT EXISTS equipment_fts USING fts5(
+                название,
+                content='equipment',
+                content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            );
+            CREATE TRIGGER IF NOT EXISTS equipment_fts_ai AFTER INSERT ON equipment BEGIN
+                INSERT INTO equipment_fts(rowid, название)
+                VALUES (new.id, new.название);
+            END;
+            CREATE TRIGGER IF NOT EXISTS equipment_fts_ad AFTER DELETE ON equipment BEGIN
+                INSERT INTO equipment_fts(equipment_fts, rowid, название)
+                VALUES ('delete', old.id, old.название);
+            END;
+            CREATE TRIGGER IF NOT EXISTS equipment_fts_au AFTER UPDATE OF название ON equipment BEGIN
+                INSERT INTO equipment_fts(equipment_fts, rowid, название)
+                VALUES ('delete', old.id, old.название);
+                INSERT INTO equipment_fts(rowid, название)
+                VALUES (new.id, new.название);
+            END;
+
+            CREATE VIRTUAL TABLE IF NOT EXISTS components_fts USING fts5(
+                название,
+                content='components',
+                content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            );
+            CREATE TRIGGER IF NOT EXISTS components_fts_ai AFTER INSERT ON components BEGIN
+                INSERT INTO components_fts(rowid, название)
+                VALUES (new.id, new.название);
+            END;
+            CREATE TRIGGER IF NOT EXISTS components_fts_ad AFTER DELETE ON components BEGIN
+                INSERT INTO components_fts(components_fts, rowid, название)
+                VALUES ('delete', old.id, old.название);
+            END;
+            CREATE TRIGGER IF NOT EXISTS components_fts_au AFTER UPDATE OF название ON components BEGIN
+                INSERT INTO components_fts(components_fts, rowid, название)
+                VALUES ('delete', old.id, old.название);
+                INSERT INTO components_fts(rowid, название)
+                VALUES (new.id, new.название);
+            END;
+            """
+        )
+        # Индексация уже существующих строк при первом создании FTS-таблиц
+        if not had_fts:
+            for table in TABLES.values():
+                await self.conn.execute(
+                    f"INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')"
+                )
+        await self.conn.commit()
+
+    async def get_by_id(self, item_type: str, item_id: int) -> Optional[Dict]:
+        """Поиск позиции по ID"""
+        sql = GET_BY_ID_SQL.get(item_type)
+        if sql is None:
+            return None
+
+        async with self.conn.execute(sql, (item_id,)) as cur:
+            row = await cur.fetchone()
+        if row is None:
+            return None
+
+        item = dict(row)
+        item["item_type"] = item_type
+        return item
+
+    async def search_by_name(self, name: str) -> List[Dict]:
+        """Полнотекстовый поиск позиций по названию во всех таблицах"""
+        # Фраза в кавычках с поиском по префиксу последнего слова
+        escaped = name.replace('"', '""')
+        pattern = f'"{escaped}"*'
+        results = []
+        for item_type, sql in SEARCH_BY_NAME_SQL.items():
+            async with self.conn.execute(sql, (pattern,)) as cur:
+                rows = await cur.fetchall()
+            for row in rows:
+                item = dict(row)
+                item["item_type"] = item_type
+                results.append(item)
+        return results
+
+    async def update_quantity(
+        self, item_type: str, item_id: int, delta: int
+    ) -> Optional[Dict]:
+        """Изменение количества на delta, возвращает обновлённую строку"""
+        sql = UPDATE_QUANTITY_SQL.get(item_type)
+        if sql is None:
+            return None
+
+        async with self.conn.execute(sql, (delta, item_id)) as cur:
+            row = await cur.fetchone()
+        if row is None:
+            return None
+
+        item = dict(row)
+        item["item_type"] = item_type
+        return item
+
+    async def add_new_equipment(self, name: str, eq_type: str, qty: int) -> int:
+        """Добавление нового оборудования, возвращает ID"""
+        cur = await self.conn.execute(INSERT_EQUIPMENT_SQL, (name, eq_type, qty))
+        return cur.lastrowid
+
+    async def add_new_component(
+        self, name: str, qty: int, size: str, comp_type: str
+    ) -> int:
+        """Добавление нового компонента, возвращает ID"""
+        cur = await self.conn.execute(
+            INSERT_COMPONENT_SQL, (name, qty, size, comp_type)
+        )
+        return cur.lastrowid
+
+    def log_action(
+        self,
+        user_id: int,
+        action: str,
+        item_type: str,
+        item_id: int,
+        details: Optional[str] = None,
+    ):
+        """Постановка записи журнала в очередь на пакетную запись"""
+        self._log_q.put_nowait(
+            (user_id, action, item_type, item_id, details, time.time())
+        )
+
+    async def _write_log_batch(self, batch: List[Tuple]):
+        """Запись пачки журнала одной транзакцией"""
+        await self.conn.execute("BEGIN")
+        await self.conn.executemany(INSERT_LOG_SQL, batch)
+        await self.conn.commit()
+
+    async def _flush_pending_logs(self):
+        """Дозапись всего накопленного журнала"""
+        batch = []
+        while not self._log_q.empty():
+            batch.append(self._log_q.get_nowait())
+        if batch:
+            await self._write_log_batch(batch)
+
+    async def log_flusher(self):
+        """Фоновая задача: сброс журнала пачками по размеру или таймауту"""
+        while True:
+            batch = [await self._log_q.get()]
+            try:
+                while len(batch) < LOG_BATCH_SIZE:
+                    batch.append(
+                        await asyncio.wait_for(
+                            self._log_q.get(), timeout=LOG_FLUSH_INTERVAL
+                        )
+                    )
+            except asyncio.TimeoutError:
+                pass
+            await self._write_log_batch(batch)
@@ -0,0 +1,56 @@
+import sys
+from typing import Dict, Tuple
+
+# Допустимые типы позиций для /add и /give; значения интернированы,
+# чтобы дальнейшая диспетчеризация по типу сравнивала указатели
+_CANON_TYPES = {t: sys.intern(t) for t in ("Оборудование", "Компоненты")}
+
+
+# Готовые шаблоны карточки позиции по типу
+_ITEM_TMPL = {
+    "Оборудование": (
+        "Тип: Оборудование\n"
+        "ID: {id}\n"
+        "Название: {название}\n"
+        "Количество: {количество}\n"
+        "Тип оборудования: {тип}"
+    ),
+    "Компоненты": (
+        "Тип: Компоненты\n"
+        "ID: {id}\n"
+        "Название: {название}\n"
+        "Количество: {количество}\n"
+        "Размер:{размер}\n"
+        "Тип компонента: {тип}"
+    ),
+}
+
+
+def format_item_info(item_type: str, item: Dict) -> str:
+    """Форматирование информации о позиции по готовому шаблону"""
+    return _ITEM_TMPL[item_type].format_map(item)
+
+
+def split_pipes(text: str, n: int) -> Tuple[str, ...]:
+    """Разбор строки из n полей через вертикальную черту (|)"""
+    parts = []
+    rest = text
+    for _ in range(n - 1):
+        field, sep, rest = rest.partition("|")
+        if not sep:
+            raise ValueError("Неверное количество параметров")
+        parts.append(field.strip())
+    if "|" in rest:
+        raise ValueError("Неверное количество параметров")
+    parts.append(rest.strip())
+    return tuple(parts)
+
+
+def parse_modify(text: str) -> Tuple[str, str, int, int]:
+    """Разбор /add|/give: (команда, тип, ID, количество)"""
+    command, item_type, item_id, qty = text.split()
+    try:
+        item_type = _CANON_TYPES[item_type]
+    except KeyError:
+        raise ValueError("Некорректный тип") from None
+    return command, item_type, int(item_id), int(qty)
@@ -0,0 +1,41 @@
+from typing import Dict, List, Optional, Tuple
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+
+# Индексы полей записи [состояние, данные]
+_STATE = 0
+_DATA = 1
+
+
+class FastMemoryStorage(BaseStorage):
+    """FSM-хранилище в памяти с плоским ключом (chat_id, user_id)"""
+
+    def __init__(self):
+        self._data: Dict[Tuple[int, int], List] = {}
+
+    def _record(self, key: StorageKey) -> List:
+        k = (key.chat_id, key.user_id)
+        record = self._data.get(k)
+        if record is None:
+            record = self._data[k] = [None, {}]
+        return record
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        self._record(key)[_STATE] = (
+            state.state if isinstance(state, State) else state
+        )
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        record = self._data.get((key.chat_id, key.user_id))
+        return record[_STATE] if record else None
+
+    async def set_data(self, key: StorageKey, data: Dict) -> None:
+        self._record(key)[_DATA] = data
+
+    async def get_data(self, key: StorageKey) -> Dict:
+        record = self._data.get((key.chat_id, key.user_id))
+        return record[_DATA].copy() if record else {}
+
+    async def close(self) -> None:
+        self._data.clear()
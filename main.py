@@ -1,10 +1,17 @@
+import asyncio
 import os
 import logging
-from typing import Optional, Dict
+import logging.handlers
+import queue
+import re
+from functools import lru_cache
+from typing import Final, Optional, Dict
+import orjson
 from dotenv import load_dotenv
 from aiogram import Bot, Dispatcher, F
+from aiogram.client.session.aiohttp import AiohttpSession
 from aiogram.enums import ParseMode
-from aiogram.filters import Command
+from aiogram.filters import Filter
 from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
@@ -12,16 +19,51 @@ from aiogram.utils.keyboard import InlineKeyboardBuilder
 
 # Локальные модули
 from database import StorageDB
+from fast_handlers import format_item_info, parse_modify, split_pipes
+from fast_storage import FastMemoryStorage
+import storage_cache
 
 # --- Инициализация окружения ---
 load_dotenv()
 
 # --- Инициализация базы данных ---
 db = StorageDB()
+storage_cache.init(db)
 
 # --- Настройка бота ---
-bot = Bot(token=os.getenv("BOT_TOKEN"))
-dp = Dispatcher()
+def _orjson_dumps(obj) -> str:
+    """Сериализация в JSON через orjson (bytes -> str для aiohttp)"""
+    return orjson.dumps(obj).decode()
+
+# Общая HTTP-сессия: keep-alive, увеличенный пул соединений к Telegram
+# и (де)сериализация JSON через orjson вместо стандартного json
+session = AiohttpSession(json_loads=orjson.loads, json_dumps=_orjson_dumps)
+session._connector_init.update(
+    limit=256,
+    limit_per_host=64,
+    keepalive_timeout=75,
+    ttl_dns_cache=300,
+)
+bot = Bot(token=os.getenv("BOT_TOKEN"), session=session)
+dp = Dispatcher(storage=FastMemoryStorage())
+
+# --- Диспетчеризация команд ---
+# Один предкомпилированный автомат на все команды бота;
+# самые длинные альтернативы первыми, чтобы избежать возвратов
+_COMMAND_RE = re.compile(r"^/(add_new|cancel|search|start|give|add)(?:@\w+)?(?:\s|$)")
+
+class FastCommand(Filter):
+    """Фильтр команд через общий предкомпилированный регэксп"""
+
+    def __init__(self, *commands: str):
+        self.commands = frozenset(commands)
+
+    async def __call__(self, message: Message) -> bool:
+        text = message.text
+        if not text:
+            return False
+        match = _COMMAND_RE.match(text)
+        return match is not None and match.group(1) in self.commands
 
 # --- Состояния FSM ---
 class NewItemStates(StatesGroup):
@@ -29,25 +71,37 @@ class NewItemStates(StatesGroup):
     INPUT_EQUIPMENT = State()
     INPUT_COMPONENT = State()
 
-# --- Вспомогательные функции ---
-def format_item_info(item_type: str, item: Dict) -> str:
-    """Форматирование информации о позиции"""
-    base = (
-        f"Тип: {item_type}\n"
-        f"ID: {item['id']}\n"
-        f"Название: {item['название']}\n"
-        f"Количество: {item['количество']}"
-    )
-    
-    if item_type == "Оборудование":
-        return f"{base}\nТип оборудования: {item['тип']}"
-    else:
-        return (
-            f"{base}\n"
-            f"Размер:{item['размер']}\n"
-            f"Тип компонента: {item['тип']}"
-        )
+# --- Тексты сообщений (собираются один раз при импорте) ---
+START_TEXT: Final[str] = (
+    "🏭 Система управления складом\n\n"
+    "Доступные команды:\n"
+    "/search [ID или название] - Поиск позиции\n"
+    "/add [тип] [ID] [кол-во] - Добавить количество\n"
+    "/give [тип] [ID] [кол-во] - Взять количество\n"
+    "/add_new - Добавить новую позицию\n"
+    "/cancel - Отменить текущее действие"
+)
+MODIFY_USAGE: Final[str] = (
+    "❌ Неверный формат команды\n"
+    "Примеры:\n"
+    "/add Оборудование 123 10\n"
+    "/give Компоненты 456 5"
+)
+EQ_PROMPT: Final[str] = (
+    "📝 Введите данные оборудования через вертикальную черту (|):\n"
+    "Название | Тип | Количество\n\n"
+    "Пример:\n"
+    "Станок ЧПУ | Металлообработка | 5"
+)
+CHOOSE_TYPE_PROMPT: Final[str] = "📝 Выберите тип новой позиции:"
+COMP_PROMPT: Final[str] = (
+    "📝 Введите данные компонента через вертикальную черту (|):\n"
+    "Название | Количество | Размер | Тип\n\n"
+    "Пример:\n"
+    "Болт М12 | 100 | 12x50 мм | Крепеж"
+)
 
+# --- Вспомогательные функции ---
 def create_type_keyboard():
     """Клавиатура для выбора типа позиции"""
     builder = InlineKeyboardBuilder()
@@ -56,38 +110,46 @@ def create_type_keyboard():
     builder.adjust(1)
     return builder.as_markup()
 
+# Статичная клавиатура выбора типа, собранная один раз
+_TYPE_KEYBOARD = create_type_keyboard()
+
+@lru_cache(maxsize=4096)
+def _search_details(term: str) -> str:
+    """Строка деталей журнала для повторяющихся поисковых запросов"""
+    return f"Поиск: {term}"
+
+@lru_cache(maxsize=1024)
+def _modify_details(qty: int) -> str:
+    """Строка деталей журнала для типовых изменений количества"""
+    return f"Изменение на {qty}"
+
 # --- Обработчики команд ---
-@dp.message(Command("start"))
+@dp.message(FastCommand("start"))
 async def cmd_start(message: Message):
-    await message.answer(
-        "🏭 Система управления складом\n\n"
-        "Доступные команды:\n"
-        "/search [ID или название] - Поиск позиции\n"
-        "/add [тип] [ID] [кол-во] - Добавить количество\n"
-        "/give [тип] [ID] [кол-во] - Взять количество\n"
-        "/add_new - Добавить новую позицию\n"
-        "/cancel - Отменить текущее действие"
-    )
+    await message.answer(START_TEXT)
 
-@dp.message(Command("cancel"))
+@dp.message(FastCommand("cancel"))
 async def cmd_cancel(message: Message, state: FSMContext):
     await state.clear()
     await message.answer("🚫 Действие отменено")
 
-@dp.message(Command("search"))
+@dp.message(FastCommand("search"))
 async def cmd_search(message: Message):
     args = message.text.split(maxsplit=2)
-    print(args)
     if len(args) < 3:
         return await message.answer("❌ Укажите таблицу, название или ID для поиска")
     
     item_type = args[1].strip()
     search_term = args[2].strip()
     
-    # Поиск по ID
-    if search_term.isdigit():
+    # Поиск по ID: один разбор вместо isdigit() + int()
+    try:
         item_id = int(search_term)
-        item = db.get_by_id(item_type, item_id)
+    except ValueError:
+        item_id = None
+
+    if item_id is not None:
+        item = await storage_cache.get_by_id(item_type, item_id)
         if not item:
             return await message.answer("🔎 Позиция не найдена")
             
@@ -101,7 +163,7 @@ async def cmd_search(message: Message):
         return await message.answer(response)
     
     # Поиск по названию
-    results = db.search_by_name(search_term)
+    results = await storage_cache.search_by_name(search_term)
     if not results:
         return await message.answer("🔎 Ничего не найдено")
     
@@ -117,25 +179,21 @@ async def cmd_search(message: Message):
         action="SEARCH",
         item_type="ALL",
         item_id=0,
-        details=f"Поиск: {search_term}"
+        details=_search_details(search_term)
     )
     await message.answer("\n".join(response))
 
-@dp.message(Command("add", "give"))
+@dp.message(FastCommand("add", "give"))
 async def cmd_modify(message: Message):
     try:
-        command, item_type, item_id, qty = message.text.split()
-        item_id = int(item_id)
-        qty = int(qty)
-        
+        command, item_type, item_id, qty = parse_modify(message.text)
+
         if command == "/give":
             qty = -abs(qty)
 
-        if item_type not in ["Оборудование", "Компоненты"]:
-            raise ValueError("Некорректный тип")
-            
-        if db.update_quantity(item_type, item_id, qty):
-            item = db.get_by_id(item_type, item_id)
+        item = await db.update_quantity(item_type, item_id, qty)
+        if item:
+            storage_cache.invalidate(item_type, item_id)
             response = (
                 "✅ Успешно обновлено!\n"
                 f"{format_item_info(item_type, item)}"
@@ -146,7 +204,7 @@ async def cmd_modify(message: Message):
                 action=action,
                 item_type=item_type,
                 item_id=item_id,
-                details=f"Изменение на {qty}"
+                details=_modify_details(qty)
             )
         else:
             response = "❌ Ошибка обновления"
@@ -154,19 +212,11 @@ async def cmd_modify(message: Message):
         await message.answer(response)
         
     except (ValueError, IndexError):
-        await message.answer(
-            "❌ Неверный формат команды\n"
-            "Примеры:\n"
-            "/add Оборудование 123 10\n"
-            "/give Компоненты 456 5"
-        )
+        await message.answer(MODIFY_USAGE)
 
-@dp.message(Command("add_new"))
+@dp.message(FastCommand("add_new"))
 async def cmd_add_new(message: Message, state: FSMContext):
-    await message.answer(
-        "📝 Выберите тип новой позиции:",
-        reply_markup=create_type_keyboard()
-    )
+    await message.answer(CHOOSE_TYPE_PROMPT, reply_markup=_TYPE_KEYBOARD)
     await state.set_state(NewItemStates.CHOOSE_TYPE)
 
 # --- Обработчики FSM ---
@@ -178,31 +228,18 @@ async def process_type(callback: CallbackQuery, state: FSMContext):
     await state.update_data(item_type=item_type)
     
     if item_type == "Оборудование":
-        await callback.message.answer(
-            "📝 Введите данные оборудования через вертикальную черту (|):\n"
-            "Название | Тип | Количество\n\n"
-            "Пример:\n"
-            "Станок ЧПУ | Металлообработка | 5"
-        )
+        await callback.message.answer(EQ_PROMPT)
         await state.set_state(NewItemStates.INPUT_EQUIPMENT)
     else:
-        await callback.message.answer(
-            "📝 Введите данные компонента через вертикальную черту (|):\n"
-            "Название | Количество | Размер | Тип\n\n"
-            "Пример:\n"
-            "Болт М12 | 100 | 12x50 мм | Крепеж"
-        )
+        await callback.message.answer(COMP_PROMPT)
         await state.set_state(NewItemStates.INPUT_COMPONENT)
 
 @dp.message(NewItemStates.INPUT_EQUIPMENT)
 async def process_equipment(message: Message, state: FSMContext):
     try:
-        parts = [p.strip() for p in message.text.split("|")]
-        if len(parts) != 3:
-            raise ValueError("Неверное количество параметров")
-            
-        name, eq_type, qty = parts
-        item_id = db.add_new_equipment(name, eq_type, int(qty))
+        name, eq_type, qty = split_pipes(message.text, 3)
+        item_id = await db.add_new_equipment(name, eq_type, int(qty))
+        storage_cache.invalidate()
         
         await message.answer(
             f"✅ Оборудование добавлено!\n"
@@ -222,12 +259,9 @@ async def process_equipment(message: Message, state: FSMContext):
 @dp.message(NewItemStates.INPUT_COMPONENT)
 async def process_component(message: Message, state: FSMContext):
     try:
-        parts = [p.strip() for p in message.text.split("|")]
-        if len(parts) != 4:
-            raise ValueError("Неверное количество параметров")
-            
-        name, qty, size, comp_type = parts
-        item_id = db.add_new_component(name, int(qty), size, comp_type)
+        name, qty, size, comp_type = split_pipes(message.text, 4)
+        item_id = await db.add_new_component(name, int(qty), size, comp_type)
+        storage_cache.invalidate()
         
         await message.answer(
             f"✅ Компонент добавлен!\n"
@@ -246,9 +280,28 @@ async def process_component(message: Message, state: FSMContext):
 
 # --- Запуск приложения ---
 async def main():
-    logging.basicConfig(level=logging.INFO)
-    await dp.start_polling(bot)
+    # Логи уходят через очередь в отдельный поток, чтобы
+    # форматирование и запись не блокировали цикл событий
+    log_q: queue.Queue = queue.Queue(-1)
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(logging.handlers.QueueHandler(log_q))
+    listener = logging.handlers.QueueListener(log_q, logging.StreamHandler())
+    listener.start()
+
+    await db.connect()
+    flusher = asyncio.create_task(db.log_flusher())
+    try:
+        await dp.start_polling(
+            bot,
+            polling_timeout=25,
+            allowed_updates=["message", "callback_query"],
+        )
+    finally:
+        flusher.cancel()
+        await db.conn.execute("PRAGMA optimize")
+        await db.close()
+        listener.stop()
 
 if __name__ == "__main__":
-    import asyncio
     asyncio.run(main())
\ No newline at end of file
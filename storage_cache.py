@@ -0,0 +1,56 @@
+from typing import Dict, List, Optional, Tuple
+
+from cachetools import TTLCache
+
+from database import StorageDB
+
+# Максимальный размер кэша позиций
+_MAX_ITEMS = 4096
+
+_db: Optional[StorageDB] = None
+
+# Кэш позиций по (тип, ID), инвалидируется при записи
+_item_cache: Dict[Tuple[str, int], Optional[Dict]] = {}
+
+# Кэш результатов поиска по названию с коротким TTL;
+# ключ без учёта регистра, чтобы всплески одинаковых запросов
+# от разных пользователей попадали в одну запись
+_name_cache: TTLCache = TTLCache(maxsize=2048, ttl=15)
+
+
+def init(db: StorageDB):
+    """Привязка кэша к экземпляру базы"""
+    global _db
+    _db = db
+
+
+async def get_by_id(item_type: str, item_id: int) -> Optional[Dict]:
+    """Поиск позиции по ID через сквозной кэш"""
+    key = (item_type, item_id)
+    if key in _item_cache:
+        return _item_cache[key]
+
+    item = await _db.get_by_id(item_type, item_id)
+    if len(_item_cache) >= _MAX_ITEMS:
+        _item_cache.clear()
+    _item_cache[key] = item
+    return item
+
+
+async def search_by_name(name: str) -> List[Dict]:
+    """Поиск по названию с кэшированием результатов"""
+    key = name.casefold()
+    results = _name_cache.get(key)
+    if results is None:
+        results = await _db.search_by_name(name)
+        _name_cache[key] = results
+    return results
+
+
+def invalidate(item_type: Optional[str] = None, item_id: Optional[int] = None):
+    """Сброс кэша после записи: точечный по (тип, ID) или полный"""
+    if item_type is None:
+        _item_cache.clear()
+    else:
+        _item_cache.pop((item_type, item_id), None)
+    _name_cache.clear()